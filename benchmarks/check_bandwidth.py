@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# 带宽管理的离线检查：本地 http.server 提供一个很大的响应，几个客户端以任务编号作为代理用户名
+# 经 ThrottlingProxy 同时下载，验证
+#   总吞吐贴近预算、各任务平分预算（令牌桶 + fair_share 每秒重新分配）、
+#   一个任务结束后剩下的任务接过它让出的份额，以及 limit-rate 模式按份额生成 --limit-rate。
+#
+#   python benchmarks/check_bandwidth.py        # 全部通过时退出码为 0
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from run_benchmarks import load_app
+
+BUDGET = 2 * 1024 * 1024        # 2 MiB/s
+WARMUP = 2.5                    # 每个阶段开始后先等重新分配稳定下来再计量
+MEASURE = 4.0
+TOLERANCE = 0.2                 # 总吞吐允许偏离预算 20%，单个任务允许偏离平均份额 25%
+BODY = b"\0" * (256 * 1024)
+
+class BlobHandler(BaseHTTPRequestHandler):
+    # 不停地发送数据，直到客户端断开
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(1 << 40))
+        self.end_headers()
+        try:
+            while True:
+                self.wfile.write(BODY)
+        except OSError:
+            pass
+
+class Client:
+    # 以 job 为代理用户名下载，received 为累计字节数
+    def __init__(self, job, url, proxy_port):
+        self.job = job
+        self.received = 0
+        self.stopped = threading.Event()
+        proxy = f"http://{job}:x@127.0.0.1:{proxy_port}"
+        self.opener = urllib.request.build_opener(urllib.request.ProxyHandler({"http": proxy}))
+        threading.Thread(target=self.run, args=(url,), daemon=True).start()
+
+    def run(self, url):
+        with self.opener.open(url, timeout=30) as response:
+            while not self.stopped.is_set():
+                data = response.read(64 * 1024)
+                if not data:
+                    break
+                self.received += len(data)
+
+    def stop(self):
+        self.stopped.set()
+
+class FakeTask:
+    def __init__(self, task_id):
+        self.task_id = task_id
+
+def measure(clients):
+    # 等重新分配稳定后计量一段时间，返回各客户端的吞吐（字节每秒）
+    time.sleep(WARMUP)
+    before = {client.job: client.received for client in clients}
+    start = time.monotonic()
+    time.sleep(MEASURE)
+    elapsed = time.monotonic() - start
+    return {client.job: (client.received - before[client.job]) / elapsed for client in clients}
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="ytb-bandwidth-")
+    os.environ["APPDATA"] = os.path.join(workdir, "config")
+    os.environ["XDG_CONFIG_HOME"] = os.environ["APPDATA"]
+    app = load_app()
+    results = []
+
+    def check(name, ok, detail=""):
+        results.append(ok)
+        print(f"{'✔' if ok else '✘'} {name}{f'：{detail}' if detail else ''}")
+
+    def rate_text(rates):
+        return "，".join(f"{job} {rate / 1024 / 1024:.2f} MiB/s" for job, rate in rates.items())
+
+    # fair_share：需求小的任务按需满足，剩余预算在其余任务之间平分
+    shares = app.fair_share(300, {"a": 50, "b": float("inf"), "c": float("inf")})
+    check("fair_share 先满足小需求再平分", shares == {"a": 50, "b": 125, "c": 125}, str(shares))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BlobHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/blob"
+    store = app.ConfigStore(os.path.join(workdir, "config.json"), app.DEFAULT_CONFIG)
+    store.update({"bandwidth_limit": str(BUDGET), "bandwidth_mode": "proxy"})
+    manager = app.BandwidthManager(store)
+    tasks = [FakeTask(f"job{index}") for index in range(3)]
+    clients = []
+    try:
+        for task in tasks:
+            manager.register(task)
+        proxy_port = manager.ensure_proxy().port
+        args = manager.command_args(tasks[0])
+        check("代理模式下 yt-dlp 经本地代理、以任务编号为用户名",
+              args == ["--proxy", f"http://job0:x@127.0.0.1:{proxy_port}"], " ".join(args))
+        clients = [Client(task.task_id, url, proxy_port) for task in tasks]
+
+        rates = measure(clients)
+        total = sum(rates.values())
+        check("三个任务同时下载时总吞吐贴近预算", abs(total - BUDGET) <= BUDGET * TOLERANCE,
+              f"{total / 1024 / 1024:.2f} MiB/s")
+        fair = total / len(rates)
+        check("三个任务平分预算", all(abs(rate - fair) <= fair * 0.25 for rate in rates.values()), rate_text(rates))
+
+        # 第三个任务结束：断开客户端并注销，剩下两个任务应各拿到一半
+        clients[2].stop()
+        manager.unregister(tasks[2])
+        survivors = clients[:2]
+        after = measure(survivors)
+        total = sum(after.values())
+        check("一个任务结束后总吞吐仍贴近预算", abs(total - BUDGET) <= BUDGET * TOLERANCE,
+              f"{total / 1024 / 1024:.2f} MiB/s")
+        check("剩下的任务接过让出的份额",
+              all(after[job] >= rates[job] * 1.3 and abs(after[job] - total / 2) <= total / 2 * 0.25 for job in after),
+              rate_text(after))
+
+        # limit-rate 模式：没有代理，按启动时的活动任务数平分预算
+        store.update({"bandwidth_mode": "limit-rate"})
+        args = manager.command_args(tasks[0])
+        check("limit-rate 模式按份额固定限速", args == ["--limit-rate", str(BUDGET // 2)], " ".join(args))
+    finally:
+        for client in clients:
+            client.stop()
+        for task in tasks:
+            manager.unregister(task)
+        if manager._proxy:
+            manager._proxy.close()
+        store.flush()
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"{sum(results)}/{len(results)} 通过")
+    return 0 if all(results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# yt-dlp 自更新的离线检查：用本地 http.server 模拟 GitHub 发布接口与下载地址，验证
+#   条件请求（ETag -> 304 沿用缓存）、检查间隔内不发请求、SHA2-256SUMS 校验通过后安装、
+#   校验不符或下载失败时抛出异常且不留下临时文件。
+#
+#   python benchmarks/check_updater.py        # 全部通过时退出码为 0
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from run_benchmarks import load_app
+
+ASSET_NAME = "yt-dlp"
+ASSET = b"#!/bin/sh\necho fake yt-dlp\n" * 4096  # 比 CHUNK_SIZE 大，覆盖分块写入
+ETAG = '"release-v1"'
+
+class Release:
+    # 服务端状态：sums 决定 SHA2-256SUMS 里写的哈希，asset_status 决定下载地址的状态码
+    def __init__(self):
+        self.sums = hashlib.sha256(ASSET).hexdigest()
+        self.asset_status = 200
+        self.requests = []          # (路径, 状态码)
+
+def make_server(release):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send_body(self, status, body, headers=()):
+            # 先记录再响应：客户端收到响应后立即检查 requests，记录晚了会读到上一条
+            release.requests.append((self.path, status))
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            base = f"http://127.0.0.1:{self.server.server_address[1]}"
+            if self.path == "/release":
+                if self.headers.get("If-None-Match") == ETAG:
+                    self.send_body(304, b"")
+                    return
+                data = {"tag_name": "2099.01.01", "assets": [
+                    {"name": ASSET_NAME, "browser_download_url": f"{base}/{ASSET_NAME}"},
+                    {"name": "SHA2-256SUMS", "browser_download_url": f"{base}/SHA2-256SUMS"},
+                ]}
+                self.send_body(200, json.dumps(data).encode("utf-8"), [("ETag", ETAG)])
+            elif self.path == "/SHA2-256SUMS":
+                self.send_body(200, f"{'0' * 64}  yt-dlp.exe\n{release.sums}  {ASSET_NAME}\n".encode("utf-8"))
+            elif self.path == f"/{ASSET_NAME}":
+                self.send_body(release.asset_status, ASSET if release.asset_status == 200 else b"")
+            else:
+                self.send_body(404, b"")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def leftovers(directory):
+    return [name for name in os.listdir(directory) if name.endswith(".part")]
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="ytb-updater-")
+    os.environ["APPDATA"] = os.path.join(workdir, "config")
+    os.environ["XDG_CONFIG_HOME"] = os.environ["APPDATA"]
+    app = load_app()
+    release = Release()
+    server = make_server(release)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    target_dir = os.path.join(workdir, "bin")
+    target = os.path.join(target_dir, ASSET_NAME)
+    state_path = os.path.join(workdir, "update_state.json")
+    results = []
+
+    def check(name, ok, detail=""):
+        results.append(ok)
+        print(f"{'✔' if ok else '✘'} {name}{f'：{detail}' if detail else ''}")
+
+    try:
+        updater = app.YtDlpUpdater(state_path, f"{base}/release", target, ASSET_NAME, interval_hours=24)
+        first = updater.latest_release(force=True)
+        check("首次检查返回发布信息并记录 ETag", first["tag_name"] == "2099.01.01" and updater.state.get("etag") == ETAG)
+
+        # 新建实例从状态文件读回 ETag，强制检查时带 If-None-Match，服务端回 304
+        updater = app.YtDlpUpdater(state_path, f"{base}/release", target, ASSET_NAME, interval_hours=24)
+        again = updater.latest_release(force=True)
+        check("条件请求得到 304 并沿用缓存的发布信息", release.requests[-1] == ("/release", 304) and again == first,
+              str(release.requests[-1]))
+
+        count = len(release.requests)
+        updater.latest_release()
+        check("检查间隔内不发请求", len(release.requests) == count)
+
+        tmp_path = updater.download(first)
+        updater.install(tmp_path)
+        with open(target, "rb") as f:
+            installed = f.read()
+        check("哈希一致时下载并安装", installed == ASSET and not leftovers(target_dir))
+
+        release.sums = "f" * 64
+        try:
+            updater.download(first)
+            check("哈希不符时拒绝", False, "没有抛出异常")
+        except RuntimeError as e:
+            check("哈希不符时拒绝且删除临时文件", not leftovers(target_dir), str(e))
+
+        release.sums = hashlib.sha256(ASSET).hexdigest()
+        release.asset_status = 500
+        try:
+            updater.download(first)
+            check("下载失败时抛出异常", False, "没有抛出异常")
+        except Exception as e:
+            check("下载失败时抛出异常且删除临时文件", not leftovers(target_dir), type(e).__name__)
+        with open(target, "rb") as f:
+            check("失败的更新不影响已安装的文件", f.read() == ASSET)
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"{sum(results)}/{len(results)} 通过")
+    return 0 if all(results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
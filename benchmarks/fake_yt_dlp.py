@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# 压测用的假 yt-dlp：不联网，按参数输出逼真的 --dump-json、-F、--flat-playlist 与高频进度行。
+# 时间与失败率由环境变量控制，单个链接可以用同名查询参数覆盖（小写，如 &duration=5&fail=1）：
+#   FAKE_YTDLP_PROBE_DELAY   探测（--dump-json / -F）耗时，秒，默认 0.05
+#   FAKE_YTDLP_DURATION      每个下载耗时，秒，默认 1
+#   FAKE_YTDLP_HZ            每秒进度行数，默认 20
+#   FAKE_YTDLP_SIZE          文件大小，字节，默认 50000000
+#   FAKE_YTDLP_FRAGMENTS     分段数，0 表示非分段下载
+#   FAKE_YTDLP_FAIL          失败概率 0~1
+#   FAKE_YTDLP_FAIL_CODE     失败时模拟的错误：403（默认）、429，或 0 表示连接被重置
+#   FAKE_YTDLP_N             播放列表条目数，默认 50
+#   FAKE_YTDLP_ENTRY_DELAY   播放列表每条之间的间隔，秒，默认 0.01
+#   FAKE_FFMPEG_DURATION     以 --ffmpeg 方式运行（假 ffmpeg，供后处理线程池使用）时每次合并 / 转码的耗时，秒，默认 0.2
+import json
+import os
+import random
+import re
+import sys
+import time
+from urllib.parse import parse_qs, urlsplit
+
+VERSION = "2099.01.01"
+DEFAULTS = {
+    "probe_delay": 0.05,
+    "duration": 1.0,
+    "hz": 20.0,
+    "size": 50_000_000,
+    "fragments": 0,
+    "fail": 0.0,
+    "fail_code": 403,
+    "n": 50,
+    "entry_delay": 0.01,
+}
+
+def settings_for(url):
+    values = {}
+    query = parse_qs(urlsplit(url or "").query)
+    for name, default in DEFAULTS.items():
+        raw = query.get(name, [os.environ.get(f"FAKE_YTDLP_{name.upper()}", default)])[0]
+        values[name] = type(default)(float(raw))
+    return values
+
+def video_id(url):
+    query = parse_qs(urlsplit(url).query)
+    if "v" in query:
+        return query["v"][0]
+    return re.sub(r"[^0-9A-Za-z_-]", "", url)[-11:] or "fakevideo00"
+
+def is_playlist(url):
+    parts = urlsplit(url)
+    return parts.path.strip("/") == "playlist" or parts.path.startswith("/@")
+
+def make_info(url):
+    vid = video_id(url)
+    settings = settings_for(url)
+    duration = 600
+    formats = [
+        {"format_id": "sb0", "ext": "mhtml", "protocol": "mhtml", "vcodec": "none", "acodec": "none", "format_note": "storyboard"},
+        {"format_id": "139", "ext": "m4a", "vcodec": "none", "acodec": "mp4a.40.5", "abr": 48.0, "protocol": "https", "format_note": "low"},
+        {"format_id": "140", "ext": "m4a", "vcodec": "none", "acodec": "mp4a.40.2", "abr": 129.0, "protocol": "https", "format_note": "medium"},
+        {"format_id": "251", "ext": "webm", "vcodec": "none", "acodec": "opus", "abr": 135.0, "protocol": "https", "format_note": "medium"},
+        {"format_id": "18", "ext": "mp4", "vcodec": "avc1.42001E", "acodec": "mp4a.40.2", "width": 640, "height": 360, "fps": 30, "tbr": 600.0, "protocol": "https", "format_note": "360p"},
+    ]
+    for height, tbr in ((480, 1000.0), (720, 2200.0), (1080, 4300.0), (1440, 9000.0), (2160, 18000.0)):
+        width = height * 16 // 9
+        formats += [
+            {"format_id": f"avc{height}", "ext": "mp4", "vcodec": "avc1.640028", "acodec": "none", "width": width, "height": height,
+             "fps": 30, "tbr": tbr, "protocol": "https", "format_note": f"{height}p"},
+            {"format_id": f"vp9{height}", "ext": "webm", "vcodec": "vp9", "acodec": "none", "width": width, "height": height,
+             "fps": 60, "tbr": tbr * 0.7, "protocol": "https", "format_note": f"{height}p60"},
+            {"format_id": f"av1{height}", "ext": "mp4", "vcodec": "av01.0.08M.08", "acodec": "none", "width": width, "height": height,
+             "fps": 60, "tbr": tbr * 0.55, "protocol": "https", "format_note": f"{height}p60"},
+        ]
+    for fmt in formats:
+        if fmt.get("tbr") or fmt.get("abr"):
+            fmt["filesize"] = int((fmt.get("tbr") or fmt.get("abr")) * 1000 / 8 * duration)
+        fmt["url"] = f"https://rr1---sn-fake.googlevideo.com/videoplayback?id={vid}&itag={fmt['format_id']}"
+    return {
+        "id": vid,
+        "title": f"Fake video {vid}",
+        "extractor": "youtube",
+        "extractor_key": "Youtube",
+        "webpage_url": url,
+        "original_url": url,
+        "duration": duration,
+        "ext": "mp4",
+        "formats": formats,
+        "requested_formats": [formats[-3], formats[2]],
+        "format_id": f"{formats[-3]['format_id']}+{formats[2]['format_id']}",
+        "_fake_size": settings["size"],
+    }
+
+def render(template, data):
+    # 只实现本程序用到的输出模板语法：%(.{a,b})j、%(x.{a,b})j 与 %(name)s
+    def replace(match):
+        field, conversion = match.group(1), match.group(2)
+        braces = re.match(r"^([\w.]*?)\.?\{([^}]*)\}$", field)
+        if braces:
+            source = data.get(braces.group(1), {}) if braces.group(1) else data
+            value = {key: source.get(key) for key in braces.group(2).split(",")}
+        else:
+            value = data.get(field)
+        if conversion == "j":
+            return json.dumps(value)
+        return "NA" if value is None else str(value)
+    return re.sub(r"%\(([^)]*)\)([sdjf])", replace, template)
+
+def parse_args(argv):
+    options = {"print": [], "progress_template": {}, "urls": []}
+    flags_with_value = {
+        "-f", "--format", "-o", "--output", "--cookies", "--load-info-json", "--download-archive",
+        "--playlist-items", "--match-filters", "--concurrent-fragments", "--http-chunk-size", "--limit-rate",
+        "--proxy", "--downloader", "--downloader-args", "--merge-output-format", "--audio-format",
+        "--ffmpeg-location", "-P", "--paths", "-N", "--postprocessor-args", "--fixup",
+    }
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("--print", "-O"):
+            options["print"].append(argv[i + 1])
+            i += 2
+        elif arg == "--progress-template":
+            kind, _, template = argv[i + 1].partition(":")
+            options["progress_template"][kind] = template
+            i += 2
+        elif arg in flags_with_value:
+            options[arg.lstrip("-")] = argv[i + 1]
+            i += 2
+        elif arg.startswith("-"):
+            options[arg.lstrip("-")] = True
+            i += 1
+        else:
+            options["urls"].append(arg)
+            i += 1
+    return options
+
+FAIL_MESSAGES = {
+    403: "HTTP Error 403: Forbidden",
+    429: "HTTP Error 429: Too Many Requests",
+    0: "[Errno 104] Connection reset by peer",
+}
+
+def fail_maybe(settings, stage):
+    if settings["fail"] and random.random() < settings["fail"]:
+        message = FAIL_MESSAGES.get(settings["fail_code"], FAIL_MESSAGES[403])
+        print(f"ERROR: [youtube] fake failure during {stage}: {message}", file=sys.stderr, flush=True)
+        sys.exit(1)
+
+def probe(options):
+    for url in options["urls"]:
+        settings = settings_for(url)
+        time.sleep(settings["probe_delay"])
+        fail_maybe(settings, "extraction")
+        if options.get("F"):
+            info = make_info(url)
+            print(f"[info] Available formats for {info['id']}:")
+            print("ID      EXT  RESOLUTION FPS │   FILESIZE   TBR PROTO │ VCODEC        ACODEC")
+            print("─" * 80)
+            for fmt in info["formats"]:
+                print(f"{fmt['format_id']:<7} {fmt['ext']:<4} {str(fmt.get('height') or 'audio only'):<10} "
+                      f"{str(fmt.get('fps') or ''):>3} │ {fmt.get('filesize') or '':>10} {fmt.get('tbr') or '':>5} "
+                      f"{fmt['protocol']:<5} │ {fmt['vcodec']:<13} {fmt['acodec']}")
+        elif is_playlist(url):
+            for index in range(int(settings["n"])):
+                print(json.dumps(make_info(f"https://www.youtube.com/watch?v=pl{index:09d}")), flush=True)
+        else:
+            print(json.dumps(make_info(url)), flush=True)
+
+def flat_playlist(options):
+    url = options["urls"][0]
+    settings = settings_for(url)
+    templates = options["print"] or ["%(url)s"]
+    print(f"[youtube:tab] Extracting URL: {url}", flush=True)
+    for index in range(int(settings["n"])):
+        if index and index % 30 == 0:
+            print(f"[youtube:tab] {video_id(url)}: Downloading page {index // 30 + 1}", flush=True)
+        vid = f"{video_id(url)[:4]}{index:07d}"
+        entry = {"_type": "url", "id": vid, "url": f"https://www.youtube.com/watch?v={vid}", "webpage_url": None,
+                 "title": f"Fake playlist entry {index + 1}", "playlist_index": index + 1}
+        for template in templates:
+            print(render(template, entry), flush=True)
+        time.sleep(settings["entry_delay"])
+
+def download(options):
+    if options.get("load-info-json"):
+        with open(options["load-info-json"], "r", encoding="utf-8") as f:
+            info = json.load(f)
+        url = info.get("webpage_url")
+    else:
+        url = options["urls"][0]
+        time.sleep(settings_for(url)["probe_delay"])
+        info = make_info(url)
+    settings = settings_for(url)
+    fail_maybe(settings, "extraction")
+    output = options.get("output") or "%(title)s [%(id)s].%(ext)s"
+    archive = options.get("download-archive")
+    if archive and os.path.exists(archive):
+        with open(archive, "r", encoding="utf-8") as f:
+            if f"youtube {info['id']}\n" in f.read():
+                print(f"[download] {info['id']}: {info['title']} has already been recorded in the archive", flush=True)
+                return
+
+    print(f"[youtube] Extracting URL: {url}", flush=True)
+    # "-f 视频,音频" 或单个格式编号表示各个流分别下载、不合并（由调用方自己后处理）；其余格式表达式按合并处理
+    formats = {fmt["format_id"]: fmt for fmt in info["formats"]}
+    requested = options.get("f") or options.get("format") or info["format_id"]
+    format_ids = requested.split(",")
+    if not all(format_id in formats for format_id in format_ids):
+        format_ids = [None]
+    print(f"[info] {info['id']}: Downloading {len(format_ids)} format(s): {requested}", flush=True)
+    for format_id in format_ids:
+        ext = formats[format_id]["ext"] if format_id in formats else "mp4"
+        path = render(output, {"title": info["title"], "id": info["id"], "ext": ext, "format_id": format_id})
+        download_stream(options, settings, path, merge=format_id is None)
+    if archive:
+        with open(archive, "a", encoding="utf-8") as f:
+            f.write(f"youtube {info['id']}\n")
+
+def download_stream(options, settings, path, merge=True):
+    print(f"[download] Destination: {path}", flush=True)
+    template = options["progress_template"].get("download")
+    size = int(settings["size"])
+    fragments = int(settings["fragments"])
+    steps = max(1, int(settings["duration"] * settings["hz"]))
+    speed = size / max(settings["duration"], 0.001)
+    start = time.time()
+    for step in range(1, steps + 1):
+        downloaded = size * step // steps
+        progress = {
+            "status": "downloading",
+            "downloaded_bytes": downloaded,
+            "total_bytes": size,
+            "total_bytes_estimate": size,
+            "speed": speed * random.uniform(0.8, 1.2),
+            "eta": (steps - step) / settings["hz"],
+            "fragment_index": fragments * step // steps if fragments else None,
+            "fragment_count": fragments or None,
+        }
+        if template:
+            print(render(template, {"progress": progress}), flush=True)
+        else:
+            print(f"[download] {downloaded * 100 / size:5.1f}% of {size / 1048576:.2f}MiB at {speed / 1048576:.2f}MiB/s", flush=True)
+        if step == steps // 2:
+            fail_maybe(settings, "download")
+        # 按绝对时间对齐，避免输出耗时累积成额外延迟
+        delay = start + step / settings["hz"] - time.time()
+        if delay > 0:
+            time.sleep(delay)
+    if template:
+        print(render(template, {"progress": {"status": "finished", "downloaded_bytes": size, "total_bytes": size}}), flush=True)
+    if merge:
+        post = options["progress_template"].get("postprocess")
+        if post:
+            print(render(post, {"progress": {"status": "started", "postprocessor": "Merger"}}), flush=True)
+            print(render(post, {"progress": {"status": "finished", "postprocessor": "Merger"}}), flush=True)
+        print(f"[Merger] Merging formats into \"{path}\"", flush=True)
+    write_placeholder(path, size)
+
+def write_placeholder(path, size):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as f:
+        f.truncate(min(size, 1 << 20))  # 不真正写入整个文件，避免压测受磁盘速度影响
+
+def fake_ffmpeg(argv):
+    # 只认 -i 输入与最后一个参数（输出文件）；输入缺失时与 ffmpeg 一样报错退出
+    inputs = [argv[i + 1] for i, arg in enumerate(argv[:-1]) if arg == "-i"]
+    for path in inputs:
+        if not os.path.exists(path):
+            print(f"{path}: No such file or directory", file=sys.stderr)
+            return 1
+    time.sleep(float(os.environ.get("FAKE_FFMPEG_DURATION", 0.2)))
+    write_placeholder(argv[-1], sum(os.path.getsize(path) for path in inputs))
+    return 0
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--ffmpeg"]:
+        return fake_ffmpeg(argv[1:])
+    options = parse_args(argv)
+    if options.get("version"):
+        print(VERSION)
+    elif options.get("flat-playlist"):
+        flat_playlist(options)
+    elif options.get("dump-json") or options.get("j") or options.get("F") or options.get("list-formats"):
+        if options.get("list-formats"):
+            options["F"] = True
+        probe(options)
+    elif options["urls"] or options.get("load-info-json"):
+        download(options)
+    else:
+        print("Usage: yt-dlp [OPTIONS] URL [URL...]", file=sys.stderr)
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+# 压测与基准：用 fake_yt_dlp.py 代替真实的 yt-dlp，离线测量下载核心与界面在负载下的表现，结果输出为 JSON。
+#
+#   python benchmarks/run_benchmarks.py                       # 全部基准，结果打印到标准输出
+#   python benchmarks/run_benchmarks.py --quick -o new.json   # 缩小规模
+#   python benchmarks/run_benchmarks.py --compare old.json    # 与旧结果逐项对比
+#   xvfb-run -a python benchmarks/run_benchmarks.py           # Linux 无显示器时在虚拟显示上跑界面相关项
+#
+# 没有 DISPLAY 时会尝试自动启动 Xvfb；仍不可用则跳过界面相关项（tk_event_loop_lag）。
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+APP_PATH = os.path.join(ROOT, "YTB 3.0.py")
+FAKE_YT_DLP = os.path.join(HERE, "fake_yt_dlp.py")
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+def summary(values, scale=1.0, digits=3):
+    if not values:
+        return {}
+    return {
+        "count": len(values),
+        "mean": round(statistics.mean(values) * scale, digits),
+        "p50": round(percentile(values, 0.5) * scale, digits),
+        "p95": round(percentile(values, 0.95) * scale, digits),
+        "max": round(max(values) * scale, digits),
+    }
+
+def jain_index(values):
+    # Jain 公平指数：1 表示完全公平，1/n 表示全部资源被一个任务占用
+    values = [value for value in values if value is not None]
+    if not values or not any(values):
+        return None
+    return round(sum(values) ** 2 / (len(values) * sum(value * value for value in values)), 4)
+
+def rss_bytes():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+def setup_environment(workdir):
+    # 假 yt-dlp 与假 ffmpeg 放在 PATH 最前面；配置目录、保存目录都在临时目录里，不影响真实配置
+    bin_dir = os.path.join(workdir, "bin")
+    os.makedirs(bin_dir, exist_ok=True)
+    for name, extra in (("yt-dlp", ""), ("ffmpeg", " --ffmpeg")):
+        if os.name == "nt":
+            with open(os.path.join(bin_dir, f"{name}.cmd"), "w", encoding="utf-8") as f:
+                f.write(f'@"{sys.executable}" "{FAKE_YT_DLP}"{extra} %*\r\n')
+        else:
+            shim = os.path.join(bin_dir, name)
+            with open(shim, "w", encoding="utf-8") as f:
+                f.write(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_YT_DLP}"{extra} "$@"\n')
+            os.chmod(shim, 0o755)
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+    config_root = os.path.join(workdir, "config")
+    os.environ["APPDATA"] = config_root
+    os.environ["XDG_CONFIG_HOME"] = config_root
+    save_path = os.path.join(workdir, "downloads")
+    os.makedirs(os.path.join(config_root, "YTBDownloader"), exist_ok=True)
+    os.makedirs(save_path, exist_ok=True)
+    config = {
+        "save_path": save_path,
+        "engine": "subprocess",         # 进程内引擎会加载真实的 yt_dlp 模块，压测统一走子进程
+        "releases_api_url": "http://127.0.0.1:9/",  # 离线：版本检查立即失败
+        "update_check_interval_hours": 1e9,
+        "skip_downloaded": False,
+    }
+    with open(os.path.join(config_root, "YTBDownloader", "config.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f)
+    return save_path
+
+def load_app():
+    spec = importlib.util.spec_from_file_location("ytb_app", APP_PATH)
+    app = importlib.util.module_from_spec(spec)
+    sys.modules["ytb_app"] = app
+    spec.loader.exec_module(app)
+    return app
+
+def make_service(app, **overrides):
+    store = app.ConfigStore(app.CONFIG_PATH, app.DEFAULT_CONFIG)
+    store.update(overrides)
+    return app.DownloadService(store)
+
+def fake_urls(count, prefix, **params):
+    query = "".join(f"&{name}={value}" for name, value in params.items())
+    return [f"https://www.youtube.com/watch?v={prefix}{index:0{11 - len(prefix)}d}{query}" for index in range(count)]
+
+def reset(service):
+    service.cancel_all()
+    service.close()
+
+def ensure_display():
+    # 返回 (是否可用, Xvfb 进程或原因)
+    if os.name == "nt" or sys.platform == "darwin" or os.environ.get("DISPLAY"):
+        return True, None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        return False, "没有 DISPLAY 且未安装 Xvfb（可用 xvfb-run -a 运行）"
+    display = f":{os.getpid() % 500 + 100}"
+    process = subprocess.Popen([xvfb, display, "-screen", "0", "1280x800x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.0)
+    if process.poll() is not None:
+        return False, "Xvfb 启动失败"
+    os.environ["DISPLAY"] = display
+    return True, process
+
+def prepare_icons(app, workdir):
+    # 仓库不附带图标文件时生成占位图标，通过 sys._MEIPASS 让 resource_path 指向它们
+    import tkinter as tk
+    names = ["搜索1.png", "下载2.png", "文1.png", "文2.png"]
+    if all(os.path.exists(app.resource_path(os.path.join("icons", name))) for name in names):
+        return
+    icon_dir = os.path.join(workdir, "meipass", "icons")
+    os.makedirs(icon_dir, exist_ok=True)
+    root = tk.Tk()
+    root.withdraw()
+    for name in names:
+        image = tk.PhotoImage(width=240, height=240)
+        image.put("#3366cc", to=(0, 0, 240, 240))
+        image.write(os.path.join(icon_dir, name), format="png")
+    root.destroy()
+    sys._MEIPASS = os.path.join(workdir, "meipass")
+
+# ---------------------------------------------------------------- 基准项
+
+def bench_progress_parse(app, scale):
+    lines = [
+        app.PROGRESS_PREFIX + json.dumps({"status": "downloading", "downloaded_bytes": i * 1000, "total_bytes": 10 ** 9,
+                                          "total_bytes_estimate": None, "speed": 1.5e6, "eta": 30,
+                                          "fragment_index": None, "fragment_count": None})
+        for i in range(1000)
+    ] + ["[download] Destination: x.mp4"] * 50
+    progress = app.TaskProgress()
+    rounds = int(200 * scale) or 1
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for line in lines:
+            progress.feed(line)
+    elapsed = time.perf_counter() - start
+    total = rounds * len(lines)
+    return {"lines": total, "lines_per_s": round(total / elapsed), "us_per_line": round(elapsed / total * 1e6, 3)}
+
+def bench_enqueue(app, scale):
+    # 提交 N 个链接到 submit_urls 返回、以及 task_added / tasks_added 事件送达的耗时
+    count = int(2000 * scale) or 10
+    service = make_service(app, max_concurrent_downloads=1, max_concurrent_probes=1)
+    added = []
+    service.add_listener(lambda event, **data: event in ("task_added", "tasks_added") and added.append(time.perf_counter()))
+    urls = fake_urls(count, "enq", duration=60, probe_delay=0.5)
+    start = time.perf_counter()
+    created = service.submit_urls(urls, "1080P")
+    submit_elapsed = time.perf_counter() - start
+    result = {
+        "urls": count,
+        "created": len(created),
+        "submit_s": round(submit_elapsed, 4),
+        "per_url_us": round(submit_elapsed / count * 1e6, 1),
+        "last_event_s": round(added[-1] - start, 4) if added else None,
+    }
+    # 重复提交：应全部被去重索引挡住
+    start = time.perf_counter()
+    service.submit_urls(urls, "1080P")
+    result["resubmit_duplicates_s"] = round(time.perf_counter() - start, 4)
+    reset(service)
+    return result
+
+def bench_scheduler(app, scale):
+    # 等长任务在并发上限下的排队顺序、等待时间与公平性
+    jobs = int(24 * scale) or 4
+    concurrency = 4
+    service = make_service(app, max_concurrent_downloads=concurrency, max_concurrent_probes=4)
+    urls = fake_urls(jobs, "sch", duration=0.5, hz=20, probe_delay=0.01)
+    submitted = time.time()
+    tasks = service.submit_urls(urls, "1080P")
+    service.wait_idle(poll=0.05)
+    elapsed = time.time() - submitted
+    started = sorted(tasks, key=lambda task: task.started_at or 0)
+    inversions = sum(1 for i, task in enumerate(started) for later in started[i + 1:]
+                     if tasks.index(later) < tasks.index(task))
+    # 同一时刻最多有几个任务在下载
+    edges = sorted([(task.started_at, 1) for task in tasks if task.started_at] +
+                   [(task.finished_at, -1) for task in tasks if task.finished_at])
+    running = peak = 0
+    for _, delta in edges:
+        running += delta
+        peak = max(peak, running)
+    service_times = [task.finished_at - task.started_at for task in tasks if task.started_at and task.finished_at]
+    waits = [task.started_at - submitted for task in tasks if task.started_at]
+    result = {
+        "jobs": jobs,
+        "concurrency_limit": concurrency,
+        "peak_concurrency": peak,
+        "total_s": round(elapsed, 3),
+        "jobs_per_s": round(jobs / elapsed, 2),
+        "start_order_inversions": inversions,
+        "wait_s": summary(waits),
+        "service_s": summary(service_times),
+        "jain_service_time": jain_index(service_times),
+        "states": {state: sum(1 for task in tasks if task.state == state) for state in {task.state for task in tasks}},
+    }
+    reset(service)
+    return result
+
+def bench_cancel(app, scale):
+    # 从调用 cancel 到 yt-dlp 进程真正退出的延迟
+    import psutil
+    jobs = int(8 * scale) or 2
+    service = make_service(app, max_concurrent_downloads=jobs, max_concurrent_probes=4)
+    tasks = service.submit_urls(fake_urls(jobs, "can", duration=120, hz=10, probe_delay=0.01), "1080P")
+    deadline = time.time() + 30
+    while time.time() < deadline and not all(task.process is not None for task in tasks):
+        time.sleep(0.05)
+    latencies = []
+    for task in tasks:
+        if task.process is None:
+            continue
+        pid = task.process.pid
+        start = time.perf_counter()
+        service.cancel(task)
+        while psutil.pid_exists(pid) and psutil.Process(pid).status() != psutil.STATUS_ZOMBIE:
+            if time.perf_counter() - start > 10:
+                break
+            time.sleep(0.001)
+        latencies.append(time.perf_counter() - start)
+    result = {"jobs": jobs, "cancel_ms": summary(latencies, scale=1000, digits=2)}
+    reset(service)
+    return result
+
+def bench_playlist(app, scale):
+    # 大频道展开：第一个条目入队与开始下载的时间，以及全部入队的时间
+    entries = int(1000 * scale) or 20
+    service = make_service(app, max_concurrent_downloads=2, max_concurrent_probes=2)
+    first = {}
+    service.add_listener(lambda event, task=None, **data: event == "task_added" and first.setdefault("added", time.perf_counter()))
+    service.add_listener(lambda event, task=None, **data: event == "task_updated" and task.state == "running"
+                         and first.setdefault("running", time.perf_counter()))
+    start = time.perf_counter()
+    service.submit_urls([f"https://www.youtube.com/playlist?list=PLbench&n={entries}&entry_delay=0.002&duration=30"], "1080P")
+    while service._expansions or not first.get("added"):
+        if time.perf_counter() - start > 120:
+            break
+        time.sleep(0.01)
+    result = {
+        "entries": entries,
+        "first_enqueued_s": round(first["added"] - start, 3) if "added" in first else None,
+        "first_running_s": round(first["running"] - start, 3) if "running" in first else None,
+        "all_enqueued_s": round(time.perf_counter() - start, 3),
+        "tasks": len(service.list_tasks()),
+    }
+    reset(service)
+    return result
+
+def bench_memory(app, scale):
+    # 长时间运行：多轮下载，每轮结束后移除已完成任务，观察内存是否持续增长
+    waves = int(6 * scale) or 2
+    per_wave = 8
+    service = make_service(app, max_concurrent_downloads=per_wave, max_concurrent_probes=4)
+    tracemalloc.start()
+    samples = []
+    for wave in range(waves):
+        tasks = service.submit_urls(fake_urls(per_wave, f"m{wave:02d}", duration=0.5, hz=100, probe_delay=0.01), "1080P")
+        service.wait_idle(poll=0.05)
+        for task in tasks:
+            service.remove_task(task)
+        gc.collect()
+        samples.append({"wave": wave, "rss": rss_bytes(), "traced": tracemalloc.get_traced_memory()[0]})
+    tracemalloc.stop()
+    traced = [sample["traced"] for sample in samples]
+    growth = (traced[-1] - traced[1]) / max(1, len(traced) - 2) if len(traced) > 2 else None
+    reset(service)
+    return {
+        "waves": waves,
+        "jobs_per_wave": per_wave,
+        "samples": samples,
+        "traced_growth_per_wave_bytes": round(growth) if growth is not None else None,
+    }
+
+def bench_log_throughput(app, scale):
+    # 多线程写结构化日志，测量写入吞吐、落盘耗时，以及日志页建偏移索引与读取一屏的耗时
+    lines = int(100000 * scale) or 1000
+    threads = 4
+    directory = tempfile.mkdtemp(prefix="ytb-logs-")
+    writer = app.LogWriter(directory, max_bytes=1 << 30)
+
+    def produce(index):
+        for i in range(lines // threads):
+            writer.write(f"[download] thread {index} line {i} " + "x" * 60, job=f"job{index}")
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=produce, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    enqueued = time.perf_counter() - start
+    writer.flush(timeout=60)
+    elapsed = time.perf_counter() - start
+
+    view = app.LogView(writer.path)
+    started = time.perf_counter()
+    view.refresh()
+    index_s = time.perf_counter() - started
+    filtered = app.LogView(writer.path, job="job1")
+    started = time.perf_counter()
+    filtered.refresh()
+    filtered_index_s = time.perf_counter() - started
+    reads = []
+    for top in range(0, len(view), max(1, len(view) // 50)):
+        started = time.perf_counter()
+        view.read(top, 40)
+        reads.append(time.perf_counter() - started)
+    result = {"lines": lines, "threads": threads, "enqueue_s": round(enqueued, 3), "elapsed_s": round(elapsed, 3),
+              "lines_per_s": round(lines / elapsed), "file_bytes": os.path.getsize(writer.path),
+              "index_s": round(index_s, 3), "filtered_index_s": round(filtered_index_s, 3),
+              "filtered_lines": len(filtered), "window_read_ms": summary(reads, scale=1000)}
+    shutil.rmtree(directory, ignore_errors=True)
+    return result
+
+def bench_tk_event_loop_lag(app, scale):
+    # 完整界面 + 多个高频进度的下载，测量 Tk 事件循环定时器的延迟
+    import tkinter as tk
+    jobs = int(20 * scale) or 4
+    duration = 6.0 * max(scale, 0.5)
+    root = tk.Tk()
+    gui = app.SimpleDownloader(root)
+    gui.service.config_store.set("max_concurrent_downloads", jobs)
+    gui.service.submit_urls(fake_urls(jobs, "lag", duration=duration, hz=50, probe_delay=0.01), "1080P")
+    lags = []
+    interval = 0.01
+    state = {"expected": time.perf_counter() + interval, "start": time.perf_counter()}
+
+    def tick():
+        now = time.perf_counter()
+        lags.append(max(0.0, now - state["expected"]))
+        state["expected"] = now + interval
+        if now - state["start"] > duration + 2:
+            root.quit()
+        else:
+            root.after(int(interval * 1000), tick)
+
+    root.after(int(interval * 1000), tick)
+    root.mainloop()
+    result = {"jobs": jobs, "progress_hz_per_job": 50, "lag_ms": summary(lags, scale=1000, digits=2)}
+    gui.service.cancel_all()
+    gui.service.close()
+    root.destroy()
+    return result
+
+def bench_cluster(app, scale):
+    # 协调节点（本进程，不在本机下载）+ 3 个工作节点子进程：总耗时与各节点完成的任务数；
+    # 第一个节点开始下载后把它杀掉，它手上的任务应在租约过期后重新排队并由其他节点完成
+    jobs = int(40 * scale) or 8
+    service = make_service(app, cluster_lease_seconds=3, cluster_heartbeat_seconds=0.5)
+    service.scheduler.run_locally = False
+    cluster = app.ClusterCoordinator(service)
+    server = app.ApiServer(service, "127.0.0.1", 0, cluster=cluster)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.address[1]}"
+    for index in range(3):
+        # 工作节点读自己的配置文件，这里给每个节点放一份压测配置（子进程引擎、离线版本检查）
+        worker_dir = os.path.join(app.CONFIG_DIR, "workers", f"w{index}")
+        os.makedirs(worker_dir, exist_ok=True)
+        shutil.copy(app.CONFIG_PATH, os.path.join(worker_dir, "config.json"))
+    workers = [subprocess.Popen([sys.executable, APP_PATH, "--worker", url, "--worker-name", f"w{index}",
+                                 "--slots", "2", "--no-update"],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) for index in range(3)]
+    try:
+        deadline = time.time() + 60
+        while len(cluster.workers) < len(workers) and time.time() < deadline:
+            time.sleep(0.05)
+        joined = len(cluster.workers)
+        submitted = time.time()
+        tasks = service.submit_urls(fake_urls(jobs, "clu", duration=1, hz=10, probe_delay=0.01), "1080P")
+        owner = {}
+        lost = []
+        killed_at = None
+        deadline = time.time() + 120
+        while time.time() < deadline:
+            with cluster._lock:
+                for task_id, lease in cluster.leases.items():
+                    if lease["worker"] in cluster.workers:
+                        owner[task_id] = cluster.workers[lease["worker"]]["name"]
+                victim = [task_id for task_id, lease in cluster.leases.items()
+                          if lease["started"] and cluster.workers.get(lease["worker"], {}).get("name") == "w0"]
+            if killed_at is None and victim:
+                workers[0].kill()
+                killed_at = time.time()
+                lost = victim
+            if all(task.state not in app.ACTIVE_STATES for task in tasks):
+                break
+            time.sleep(0.05)
+        elapsed = time.time() - submitted
+        by_id = {task.task_id: task for task in tasks}
+        done = [task for task in tasks if task.state == "done"]
+        per_worker = {}
+        for task in done:
+            per_worker[owner.get(task.task_id, "?")] = per_worker.get(owner.get(task.task_id, "?"), 0) + 1
+        result = {
+            "jobs": jobs,
+            "workers_joined": joined,
+            "total_s": round(elapsed, 3),
+            "jobs_per_s": round(jobs / elapsed, 2),
+            "done_per_worker": per_worker,
+            "killed_worker_jobs": len(lost),
+            "killed_worker_jobs_done": sum(1 for task_id in lost if by_id[task_id].state == "done"),
+            "requeue_s": round(max((by_id[task_id].finished_at or 0) for task_id in lost) - killed_at, 3) if lost else None,
+            "states": {state: sum(1 for task in tasks if task.state == state) for state in {task.state for task in tasks}},
+        }
+    finally:
+        for process in workers:
+            process.kill()
+            process.wait()
+        server.shutdown()
+        reset(service)
+    return result
+
+BENCHMARKS = [
+    ("progress_parse", bench_progress_parse, False),
+    ("enqueue", bench_enqueue, False),
+    ("scheduler", bench_scheduler, False),
+    ("cancel", bench_cancel, False),
+    ("playlist", bench_playlist, False),
+    ("cluster", bench_cluster, False),
+    ("memory", bench_memory, False),
+    ("log_throughput", bench_log_throughput, False),
+    ("tk_event_loop_lag", bench_tk_event_loop_lag, True),
+]
+
+def flatten(data, prefix=""):
+    items = {}
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            items.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            items[name] = value
+    return items
+
+def compare(old, new):
+    old_values, new_values = flatten(old.get("results", {})), flatten(new.get("results", {}))
+    rows = []
+    for name in sorted(set(old_values) & set(new_values)):
+        before, after = old_values[name], new_values[name]
+        ratio = after / before if before else None
+        rows.append(f"{name:<50} {before:>14} {after:>14} {'' if ratio is None else f'{ratio:>8.2f}x'}")
+    return "\n".join(rows)
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "-C", ROOT, "describe", "--always", "--dirty"],
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="YTB视频下载器压测（使用假 yt-dlp，离线运行）")
+    parser.add_argument("--only", help="只运行指定基准，逗号分隔：" + ",".join(name for name, _, _ in BENCHMARKS))
+    parser.add_argument("--quick", action="store_true", help="缩小规模，用于快速检查")
+    parser.add_argument("--scale", type=float, default=1.0, help="规模系数")
+    parser.add_argument("-o", "--output", help="结果 JSON 写入文件")
+    parser.add_argument("--compare", help="与之前的结果 JSON 对比")
+    args = parser.parse_args(argv)
+    scale = args.scale * (0.2 if args.quick else 1.0)
+    selected = set(args.only.split(",")) if args.only else None
+
+    workdir = tempfile.mkdtemp(prefix="ytb-bench-")
+    setup_environment(workdir)
+    app = load_app()
+    display_ok, display = None, None
+    results = {}
+    try:
+        for name, func, needs_display in BENCHMARKS:
+            if selected and name not in selected:
+                continue
+            if needs_display:
+                if display_ok is None:
+                    display_ok, display = ensure_display()
+                    if display_ok:
+                        prepare_icons(app, workdir)
+                if not display_ok or app.tk is None:
+                    results[name] = {"skipped": display if not display_ok else "tkinter 不可用"}
+                    continue
+            print(f"▶ {name} ...", file=sys.stderr, flush=True)
+            start = time.perf_counter()
+            try:
+                results[name] = func(app, scale)
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+            results[name]["bench_wall_s"] = round(time.perf_counter() - start, 3)
+    finally:
+        if isinstance(display, subprocess.Popen):
+            display.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scale": scale,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print(compare(json.load(f), report), file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
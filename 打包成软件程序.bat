@@ -8,6 +8,9 @@ rmdir /s /q build
 rmdir /s /q dist
 del /f /q YTBƵ.spec
 
+::REM ԤСͼ꣨ icons\scaledʱֱӶȡ
+python "YTB 3.0.py" --prescale-icons icons
+
 ::REM 
 Pyinstaller ^
 --onefile ^
@@ -18,7 +21,9 @@ Pyinstaller ^
 --add-data "icons\2.ico;icons" ^
 --add-data "icons\2.png;icons" ^
 --add-data "icons\1.png;icons" ^
+--add-data "icons\scaled;icons\scaled" ^
 --hidden-import=psutil ^
+--collect-submodules=yt_dlp ^
 --name="YTBƵ" ^
 "YTB 3.0.py"  
 ::ļ